@@ -1,5 +1,6 @@
 """A library that contains functions for creating the BSDS test set."""
 
+import concurrent.futures
 import numpy
 import os
 import pickle
@@ -29,7 +30,12 @@ def create_bsds(source_url, path_to_folder_rgbs, path_to_bsds, path_to_list_rota
         Path to the file in which the list
         storing the indices of the rotated
         luminance images is saved. The path
-        ends with ".pkl".
+        ends with ".pkl". Besides, when the
+        BSDS test set is created, a boolean
+        mask whose ith element is True if the
+        ith luminance image is rotated is saved
+        in the file with the same path, except
+        that it ends with ".npy".
     path_to_tar : str, optional
         Path to the downloaded archive containing the original
         BSDS dataset. The default value is ''. If the path
@@ -42,11 +48,24 @@ def create_bsds(source_url, path_to_folder_rgbs, path_to_bsds, path_to_list_rota
     RuntimeError
         If the number of BSDS RGB images to be
         read is not 100.
+    ValueError
+        If the file in which the boolean mask is
+        saved is either the file in which the BSDS
+        test set is saved or the file in which the
+        list is saved.
     ValueError
         If a RGB image is neither 481x321x3
         nor 321x481x3.
     
     """
+    path_to_mask_rotation = os.path.splitext(path_to_list_rotation)[0] + '.npy'
+    path_to_mask_rotation_abs = os.path.abspath(path_to_mask_rotation)
+    if path_to_mask_rotation_abs in (os.path.abspath(path_to_bsds), os.path.abspath(path_to_list_rotation)):
+        raise ValueError('The boolean mask would be saved in "{}", which overwrites another output of `create_bsds`.'.format(path_to_mask_rotation))
+    
+    # The boolean mask is not required to consider that the BSDS
+    # test set already exists. This way, the BSDS test sets created
+    # before the boolean mask was introduced are not recreated.
     if os.path.isfile(path_to_bsds) and os.path.isfile(path_to_list_rotation):
         print('"{0}" and "{1}" already exist.'.format(path_to_bsds, path_to_list_rotation))
         print('Delete them manually to recreate the BSDS test set.')
@@ -66,7 +85,16 @@ def create_bsds(source_url, path_to_folder_rgbs, path_to_bsds, path_to_list_rota
         height_bsds = 321
         width_bsds = 481
         reference_uint8 = numpy.zeros((100, height_bsds - 1, width_bsds - 1), dtype=numpy.uint8)
-        list_rotation = []
+        
+        # The luminance of the kth sideways image is written
+        # into `sideways_uint8[k, :, :]`. All the sideways
+        # luminance images are rotated at once at the end.
+        # The number of sideways images is not known in advance.
+        # As `numpy.empty` does not touch the memory, the unused
+        # slots at the end of `sideways_uint8` take no physical memory.
+        sideways_uint8 = numpy.empty((100, width_bsds - 1, height_bsds - 1), dtype=numpy.uint8)
+        mask_rotation = numpy.zeros(100, dtype=numpy.bool_)
+        nb_rotated = 0
         
         # `os.listdir` returns a list whose order depends on the OS.
         # To make `create_bsds` independent of the OS, the output of
@@ -77,31 +105,61 @@ def create_bsds(source_url, path_to_folder_rgbs, path_to_bsds, path_to_list_rota
                                                  'jpg')
         if len(list_names) != 100:
             raise RuntimeError('The number of BSDS RGB images to be read is not 100.')
-        for i in range(100):
-            path_to_file = os.path.join(path_to_folder_test,
-                                        list_names[i])
+        paths_to_files = [os.path.join(path_to_folder_test, name) for name in list_names]
+        
+        # The decoding of the BSDS RGB images releases the GIL.
+        # Therefore, the BSDS RGB images are decoded in parallel
+        # by several threads. `executor.map` yields the BSDS RGB
+        # images in the order of `paths_to_files`.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
             
             # `tls.read_image_mode` is not put into a `try` `except` clause
             # as each BSDS300 RGB image has to be read.
-            rgb_uint8 = tls.read_image_mode(path_to_file,
-                                            'RGB')
-            
-            # `tls.rgb_to_ycbcr` checks that the data-type of
-            # its input array is equal to `numpy.uint8`. `tls.rgb_to_ycbcr`
-            # also checks that its input array has 3 dimensions
-            # and its 3rd dimension is equal to 3.
-            luminance_uint8 = tls.rgb_to_ycbcr(rgb_uint8)[:, :, 0]
-            (height_image, width_image) = luminance_uint8.shape
-            if height_image == height_bsds and width_image == width_bsds:
-                reference_uint8[i, :, :] = luminance_uint8[1:height_bsds, 1:width_bsds]
-            elif width_image == height_bsds and height_image == width_bsds:
-                reference_uint8[i, :, :] = numpy.rot90(luminance_uint8[1:width_bsds, 1:height_bsds])
-                list_rotation.append(i)
-            else:
-                raise ValueError('"{0}" is neither {1}x{2}x3 nor {2}x{1}x3.'.format(path_to_file, height_bsds, width_bsds))
+            rgbs_uint8 = executor.map(tls.read_image_mode,
+                                      paths_to_files,
+                                      ['RGB']*100)
+            for (i, rgb_uint8) in enumerate(rgbs_uint8):
+                path_to_file = paths_to_files[i]
+                
+                # `tls.rgb_to_y` checks that the data-type of
+                # its input array is equal to `numpy.uint8`. `tls.rgb_to_y`
+                # also checks that its input array has 3 dimensions
+                # and its 3rd dimension is equal to 3.
+                # As the conversion into luminance is pixelwise, the
+                # 1st row and the 1st column of each RGB image are
+                # removed before the conversion. Then, the luminance
+                # of an upright image is written directly into
+                # `reference_uint8`.
+                (height_image, width_image) = rgb_uint8.shape[0:2]
+                if height_image == height_bsds and width_image == width_bsds:
+                    tls.rgb_to_y(rgb_uint8[1:height_bsds, 1:width_bsds, :],
+                                 out=reference_uint8[i, :, :])
+                elif width_image == height_bsds and height_image == width_bsds:
+                    tls.rgb_to_y(rgb_uint8[1:width_bsds, 1:height_bsds, :],
+                                 out=sideways_uint8[nb_rotated, :, :])
+                    mask_rotation[i] = True
+                    nb_rotated += 1
+                else:
+                    raise ValueError('"{0}" is neither {1}x{2}x3 nor {2}x{1}x3.'.format(path_to_file, height_bsds, width_bsds))
+        
+        # `sideways_uint8[0:nb_rotated, :, :].transpose((0, 2, 1))[:, ::-1, :]`
+        # is a view of the sideways luminance images rotated by 90 degrees
+        # counterclockwise, like `numpy.rot90`. The view is scattered into
+        # `reference_uint8` in a single copy.
+        indices_rotation = numpy.flatnonzero(mask_rotation)
+        reference_uint8[indices_rotation, :, :] = sideways_uint8[0:nb_rotated, :, :].transpose((0, 2, 1))[:, ::-1, :]
         
         numpy.save(path_to_bsds,
                    reference_uint8)
+        numpy.save(path_to_mask_rotation,
+                   mask_rotation)
+        
+        # The list storing the indices of the rotated luminance
+        # images is still saved as the scripts evaluating the
+        # compression on the BSDS test set load it. The protocol
+        # is the same as in "datasets/kodak/kodak.py" so that any
+        # supported version of Python can load the list.
+        list_rotation = indices_rotation.tolist()
         with open(path_to_list_rotation, 'wb') as file:
             pickle.dump(list_rotation, file, protocol=2)
 
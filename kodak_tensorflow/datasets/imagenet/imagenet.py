@@ -1,6 +1,9 @@
 """A library that contains a function for creating the ImageNet training and validation sets."""
 
+import collections
+import concurrent.futures
 import numpy
+import operator
 import os
 
 import tools.tools as tls
@@ -8,11 +11,11 @@ import tools.tools as tls
 def create_imagenet(path_to_folder_rgbs, width_crop, nb_training, nb_validation, path_to_training, path_to_validation, path_to_tar=''):
     """Creates the ImageNet training and validation sets.
     
-    The ImageNet RGB images are converted into
-    luminance images. Then, the luminance images
-    are cropped. Finally, the ImageNet training and
-    validation sets are filled with the luminance
-    crops and they are saved.
+    The ImageNet RGB images are cropped. Then,
+    only the crops are converted into luminance.
+    Finally, the ImageNet training and validation
+    sets are filled with the luminance crops and
+    they are saved.
     
     Parameters
     ----------
@@ -60,54 +63,135 @@ def create_imagenet(path_to_folder_rgbs, width_crop, nb_training, nb_validation,
         nb_total = nb_training + nb_validation
         
         # `width_crop` has to be divisible by 16.
-        luminances_uint8 = numpy.zeros((nb_total, width_crop, width_crop, 1), dtype=numpy.uint8)
+        # The ImageNet training and validation sets are
+        # memory-mapped files. This way, each luminance crop
+        # is written to the disk instead of being kept in RAM.
+        # The files are renamed only once they are full.
+        path_to_training_tmp = path_to_training + '.tmp'
+        path_to_validation_tmp = path_to_validation + '.tmp'
         
-        # `os.listdir` returns a list whose order depends on the OS.
-        # To make `create_bsds` independent of the OS, the output of
-        # `os.listdir` is sorted.
-        list_names = tls.clean_sort_list_strings(os.listdir(path_to_folder_rgbs),
-                                                 ('jpg', 'JPEG', 'png'))
-        i = 0
-        for name in list_names:
-            path_to_rgb = os.path.join(path_to_folder_rgbs,
-                                       name)
+        # If an exception is raised while the ImageNet training
+        # and validation sets are filled, e.g. a corrupted ImageNet
+        # RGB image or a keyboard interrupt, the partially filled
+        # files are removed before the exception is re-raised.
+        training_uint8 = None
+        validation_uint8 = None
+        crop_uint8 = None
+        try:
+            training_uint8 = numpy.lib.format.open_memmap(path_to_training_tmp,
+                                                          mode='w+',
+                                                          dtype=numpy.uint8,
+                                                          shape=(nb_training, width_crop, width_crop, 1))
+            validation_uint8 = numpy.lib.format.open_memmap(path_to_validation_tmp,
+                                                            mode='w+',
+                                                            dtype=numpy.uint8,
+                                                            shape=(nb_validation, width_crop, width_crop, 1))
             
-            # If the condition below is met, the result of
-            # the processing of `rgb_uint8` is added to the
-            # ImageNet training set. Otherwise, the result
-            # the processing of `rgb_uint8` is added to the
-            # ImageNet validation set.
-            if i < nb_training:
-                is_random = True
-            else:
-                is_random = False
-            try:
-                rgb_uint8 = tls.read_image_mode(path_to_rgb,
-                                                'RGB')
-                crop_uint8 = tls.crop_option_2d(tls.rgb_to_ycbcr(rgb_uint8)[:, :, 0],
-                                                width_crop,
-                                                is_random)
-            except (TypeError, ValueError) as err:
-                print(err)
-                print('"{}" is skipped.\n'.format(path_to_rgb))
-                continue
-            luminances_uint8[i, :, :, 0] = crop_uint8
-            i += 1
-            if i == nb_total:
-                break
-        
-        # If the previous loop was not broken,
-        # `luminances_uint8` is not full. In this
-        # case, the program crashes as the ImageNet
-        # training and validation sets should not
-        # contain any "zero" luminance crop.
-        if i != nb_total:
-            raise RuntimeError('There are not enough ImageNet RGB images at "{}" to create the ImageNet training and validation sets.'.format(path_to_folder_rgbs))
-        training_data = luminances_uint8[0:nb_training, :, :, :]
-        validation_data = luminances_uint8[nb_training:nb_total, :, :, :]
-        numpy.save(path_to_training,
-                   training_data)
-        numpy.save(path_to_validation,
-                   validation_data)
+            # `os.scandir` yields the entries in an order which depends
+            # on the OS. To make `create_imagenet` independent of the OS,
+            # the entries are sorted by name. `entry.path` is computed by
+            # `os.scandir` so there is no need to call `os.path.join`.
+            with os.scandir(path_to_folder_rgbs) as iterator_entries:
+                entries = sorted([entry for entry in iterator_entries if entry.name.endswith(('jpg', 'JPEG', 'png'))],
+                                 key=operator.attrgetter('name'))
+            paths_to_rgbs = [entry.path for entry in entries]
+            
+            # The decoding of the ImageNet RGB images releases the GIL.
+            # Therefore, the ImageNet RGB images are decoded in parallel
+            # by several threads. At most `nb_ahead` ImageNet RGB images
+            # are decoded ahead of the loop below so that the decoded
+            # ImageNet RGB images do not fill the memory.
+            nb_ahead = 4*(os.cpu_count() or 1)
+            
+            # The kernel is asked to read the next `nb_prefetch`
+            # ImageNet RGB images in the background. This way,
+            # many reads are queued on the disk at the same time.
+            nb_prefetch = 256
+            futures = collections.deque()
+            index_submission = 0
+            index_prefetch = 0
+            i = 0
+            with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                while i < nb_total:
+                    while index_prefetch < min(len(paths_to_rgbs), index_submission + nb_prefetch):
+                        tls.prefetch_file(paths_to_rgbs[index_prefetch])
+                        index_prefetch += 1
+                    while index_submission < len(paths_to_rgbs) and len(futures) < nb_ahead:
+                        path_to_rgb = paths_to_rgbs[index_submission]
+                        futures.append((path_to_rgb, executor.submit(tls.read_rgb, path_to_rgb)))
+                        index_submission += 1
+                    if not futures:
+                        break
+                    (path_to_rgb, future) = futures.popleft()
+                    
+                    # If the condition below is met, the result of
+                    # the processing of `rgb_uint8` is added to the
+                    # ImageNet training set. Otherwise, the result
+                    # the processing of `rgb_uint8` is added to the
+                    # ImageNet validation set.
+                    if i < nb_training:
+                        is_random = True
+                        crop_uint8 = training_uint8[i, :, :, 0]
+                    else:
+                        is_random = False
+                        crop_uint8 = validation_uint8[i - nb_training, :, :, 0]
+                    
+                    # The position of the crop is computed first. Then,
+                    # only the RGB pixels inside the crop are converted
+                    # into luminance, directly into `crop_uint8`.
+                    try:
+                        rgb_uint8 = future.result()
+                        (row_top_left, column_top_left) = tls.compute_position_crop(rgb_uint8.shape[0],
+                                                                                    rgb_uint8.shape[1],
+                                                                                    width_crop,
+                                                                                    is_random)
+                        tls.rgb_to_y(rgb_uint8[row_top_left:row_top_left + width_crop, column_top_left:column_top_left + width_crop, :],
+                                     out=crop_uint8)
+                    except (TypeError, ValueError) as err:
+                        print(err)
+                        print('"{}" is skipped.\n'.format(path_to_rgb))
+                        continue
+                    i += 1
+                
+                # The ImageNet RGB images which are
+                # not decoded yet are not needed.
+                for (_, future) in futures:
+                    future.cancel()
+            
+            # If the previous loop ran out of ImageNet RGB
+            # images, either `training_uint8` or `validation_uint8`
+            # is not full. In this case, the program crashes as the
+            # ImageNet training and validation sets should not
+            # contain any "zero" luminance crop.
+            # `crop_uint8` is a view of either `training_uint8`
+            # or `validation_uint8`. A memory-mapped file is closed
+            # only once all the arrays referring to it are released.
+            # On Windows, an open memory-mapped file can be neither
+            # renamed nor removed.
+            crop_uint8 = None
+            training_uint8.flush()
+            validation_uint8.flush()
+            training_uint8 = None
+            validation_uint8 = None
+            if i != nb_total:
+                raise RuntimeError('There are not enough ImageNet RGB images at "{}" to create the ImageNet training and validation sets.'.format(path_to_folder_rgbs))
+            
+            # The ImageNet training and validation sets are
+            # dropped from the page cache so that they do not
+            # evict other files, e.g. the ImageNet RGB images.
+            tls.drop_page_cache(path_to_training_tmp)
+            tls.drop_page_cache(path_to_validation_tmp)
+            os.replace(path_to_training_tmp,
+                       path_to_training)
+            os.replace(path_to_validation_tmp,
+                       path_to_validation)
+        except BaseException:
+            del crop_uint8
+            del training_uint8
+            del validation_uint8
+            for path_to_tmp in (path_to_training_tmp, path_to_validation_tmp):
+                if os.path.isfile(path_to_tmp):
+                    os.remove(path_to_tmp)
+            raise
 
 
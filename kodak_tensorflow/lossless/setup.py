@@ -7,31 +7,138 @@ in the folder containing the file "setup.py".
 Type:
 $ python setup.py build_ext --inplace
 
+To build with profile-guided optimization, type:
+$ python setup.py build_pgo
+
 """
 import pyximport
 pyximport.install()
 import numpy
 import os
+import subprocess
+import sys
 from Cython.Build import cythonize
-from distutils.core import setup, Extension
+from distutils.core import setup, Command, Extension
 # from distutils.extension import Extension
 
+# The workload below compresses two maps of signed
+# integers drawn from Laplace distributions. The binary
+# probabilities are specific to these two distributions,
+# see the function `test_compress_lossless_maps` in
+# the file "test_lossless.py".
+WORKLOAD_PGO = '''
+import numpy
+import interface_cython
+binary_probabilities = numpy.load('pseudo_data/binary_probabilities_compress_maps_0.npy')
+bin_widths = [0.5, 0.25]
+laplace_scales = [0.5, 3.]
+numpy.random.seed(0)
+for i in range(2):
+    ref_map_int16 = numpy.round(numpy.random.laplace(scale=laplace_scales[i], size=384*384*8)/bin_widths[i]).astype(numpy.int16)
+    interface_cython.compress_lossless_flattened_map(ref_map_int16,
+                                                     binary_probabilities[i, :])
+'''
+
+class BuildPGO(Command):
+    """Command for building the C++ code with profile-guided optimization.
+    
+    The C++ code is built with instrumentation.
+    Then, the instrumented build runs a workload
+    and it records profiles. Finally, the C++ code
+    is rebuilt using these profiles.
+    
+    """
+    
+    description = 'build the C++ code in place with profile-guided optimization'
+    user_options = [
+        ('path-to-profiles=', None, 'path to the folder storing the profiles')
+    ]
+    
+    def initialize_options(self):
+        """Sets the default value of each option."""
+        self.path_to_profiles = 'pgo-data'
+    
+    def finalize_options(self):
+        """Makes the path to the folder storing the profiles absolute."""
+        self.path_to_profiles = os.path.abspath(self.path_to_profiles)
+    
+    def run(self):
+        """Builds the C++ code with profile-guided optimization."""
+        ext = self.distribution.ext_modules[0]
+        extra_compile_args = ext.extra_compile_args
+        extra_link_args = ext.extra_link_args
+        flags_generate = ['-fprofile-generate={}'.format(self.path_to_profiles)]
+        ext.extra_compile_args = extra_compile_args + flags_generate
+        ext.extra_link_args = extra_link_args + flags_generate
+        self.build_ext_inplace()
+        
+        # If the workload fails, the instrumented build
+        # is replaced by a build without instrumentation.
+        # Otherwise, each import of the instrumented build
+        # would write profiles when the program exits.
+        try:
+            subprocess.check_call([sys.executable, '-c', WORKLOAD_PGO])
+        except BaseException:
+            ext.extra_compile_args = extra_compile_args
+            ext.extra_link_args = extra_link_args
+            self.build_ext_inplace()
+            raise
+        
+        # `-fprofile-correction` fixes the profiles which
+        # are inconsistent.
+        flags_use = ['-fprofile-use={}'.format(self.path_to_profiles), '-fprofile-correction']
+        ext.extra_compile_args = extra_compile_args + flags_use
+        ext.extra_link_args = extra_link_args + flags_use
+        self.build_ext_inplace()
+    
+    def build_ext_inplace(self):
+        """Builds the C++ code in place, even if the build is up-to-date."""
+        command_build_ext = self.reinitialize_command('build_ext')
+        command_build_ext.inplace = 1
+        command_build_ext.force = 1
+        self.run_command('build_ext')
+
 if __name__ == '__main__':
-    path_to_cplusplus = '/kaggle/temp/Autoencoder/kodak_tensorflow/lossless/c++/source/'
+    
+    # The paths are relative to the folder containing
+    # the file "setup.py". An absolute path to the file
+    # "interface_cython.pyx" would make Cython name the
+    # generated C++ file after this path.
+    path_to_cplusplus = 'c++/source/'
     sources = [
-        '/kaggle/temp/Autoencoder/kodak_tensorflow/lossless/interface_cython.pyx',
+        'interface_cython.pyx',
         os.path.join(path_to_cplusplus, 'utils.cpp'),
         os.path.join(path_to_cplusplus, 'Bitstream.cpp'),
         os.path.join(path_to_cplusplus, 'BinaryArithmeticCoder.cpp'),
         os.path.join(path_to_cplusplus, 'LosslessCoder.cpp'),
         os.path.join(path_to_cplusplus, 'compression.cpp')
     ]
+    
+    # The arithmetic coder is compiled for the CPU of the
+    # machine building it. `-march=native` enables the
+    # instruction set extensions of this CPU, e.g. AVX2
+    # and BMI2 on recent x86-64 CPUs. The link-time
+    # optimization inlines across the C++ files.
     ext = Extension('interface_cython',
                     sources=sources,
                     language='c++',
-                    extra_compile_args=['-std=c++11']
+                    define_macros=[('NDEBUG', None), ('NPY_NO_DEPRECATED_API', 'NPY_1_7_API_VERSION')],
+                    extra_compile_args=['-std=c++11', '-O3', '-march=native', '-funroll-loops', '-fvisibility=hidden', '-flto'],
+                    extra_link_args=['-O3', '-flto']
                     )
-    setup(ext_modules=cythonize(ext),
-          include_dirs=[numpy.get_include()])
+    
+    # The Cython interface only takes the address of
+    # the 1st element of arrays which are never empty.
+    # Therefore, the checks below are not needed.
+    compiler_directives = {
+        'language_level': '3',
+        'boundscheck': False,
+        'wraparound': False,
+        'cdivision': True,
+        'initializedcheck': False
+    }
+    setup(ext_modules=cythonize(ext, compiler_directives=compiler_directives),
+          include_dirs=[numpy.get_include()],
+          cmdclass={'build_pgo': BuildPGO})
 
 
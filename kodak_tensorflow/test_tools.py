@@ -140,6 +140,30 @@ class TesterTools(object):
         plt.savefig('tools/pseudo_visualization/compute_bjontegaard.png')
         plt.clf()
     
+    def test_compute_position_crop(self):
+        """Tests the function `compute_position_crop`.
+        
+        The test is successful if the position of the
+        top-left corner of the random crop belongs to
+        [|0, 36|]x[|0, 136|] and the position of the
+        top-left corner of the central crop is (18, 68).
+        
+        """
+        height_image = 100
+        width_image = 200
+        width_crop = 64
+        
+        position_random = tls.compute_position_crop(height_image,
+                                                    width_image,
+                                                    width_crop,
+                                                    True)
+        position_center = tls.compute_position_crop(height_image,
+                                                    width_image,
+                                                    width_crop,
+                                                    False)
+        print('Position of the top-left corner of the random crop: {}'.format(position_random))
+        print('Position of the top-left corner of the central crop: {}'.format(position_center))
+    
     def test_convert_approx_entropy(self):
         """Tests the function `convert_approx_entropy`.
         
@@ -319,6 +343,15 @@ class TesterTools(object):
         print('5th entropy computed by the function: {}'.format(disc_entropy_4))
         print('Entropy computed by hand: {}'.format(entropy_expected))
     
+    def test_drop_page_cache(self):
+        """Tests the function `drop_page_cache`.
+        
+        The test is successful if no exception is raised.
+        
+        """
+        tls.drop_page_cache('tools/pseudo_data/rgb_web.jpg')
+        print('"tools/pseudo_data/rgb_web.jpg" is dropped from the page cache.')
+    
     def test_float_to_str(self):
         """Tests the function `float_to_str`.
         
@@ -491,6 +524,19 @@ class TesterTools(object):
                         'Evolution of the neural activation with the input',
                         'tools/pseudo_visualization/plot_graphs.png')
     
+    def test_prefetch_file(self):
+        """Tests the function `prefetch_file`.
+        
+        The test is successful if no exception is
+        raised when the file exists and when the
+        file does not exist.
+        
+        """
+        tls.prefetch_file('tools/pseudo_data/rgb_web.jpg')
+        print('"tools/pseudo_data/rgb_web.jpg" is prefetched.')
+        tls.prefetch_file('tools/pseudo_data/missing.jpg')
+        print('The prefetching of "tools/pseudo_data/missing.jpg" is skipped.')
+    
     def test_psnr_2d(self):
         """Tests the function `psnr_2d`.
         
@@ -593,6 +639,49 @@ class TesterTools(object):
                 print('The reading of "{}" raises a `ValueError` exception.'.format(path_to_cmyk))
                 print(err)
     
+    def test_read_rgb(self):
+        """Tests the function `read_rgb`.
+        
+        The test is successful if the file "tools/pseudo_data/rgb_web.jpg"
+        is read normally and the RGB image is equal to the RGB image read by
+        the function `read_image_mode`. However, the reading of
+        "tools/pseudo_data/cmyk_snake.jpg" and the reading of
+        "tools/pseudo_data/cmyk_mushroom.jpg" each raises
+        a `ValueError` exception.
+        
+        """
+        path_to_rgb = 'tools/pseudo_data/rgb_web.jpg'
+        paths_to_cmyks = (
+            'tools/pseudo_data/cmyk_snake.jpg',
+            'tools/pseudo_data/cmyk_mushroom.jpg'
+        )
+        
+        rgb_uint8 = tls.read_rgb(path_to_rgb)
+        print('The reading of "{0}" yields a Numpy array with shape {1} and data-type {2}.'.format(path_to_rgb, rgb_uint8.shape, rgb_uint8.dtype))
+        print('Is this RGB image equal to the RGB image read by `read_image_mode`? {}'.format(numpy.array_equal(rgb_uint8, tls.read_image_mode(path_to_rgb, 'RGB'))))
+        for path_to_cmyk in paths_to_cmyks:
+            try:
+                cmyk_uint8 = tls.read_rgb(path_to_cmyk)
+            except ValueError as err:
+                print('The reading of "{}" raises a `ValueError` exception.'.format(path_to_cmyk))
+                print(err)
+    
+    def test_rgb_to_y(self):
+        """Tests the function `rgb_to_y`.
+        
+        The test is successful if the luminance
+        computed by the function is equal to the
+        luminance channel computed by the function
+        `rgb_to_ycbcr`.
+        
+        """
+        rgb_uint8 = tls.read_image_mode('tools/pseudo_data/rgb_web.jpg',
+                                        'RGB')
+        luminance_uint8 = tls.rgb_to_y(rgb_uint8)
+        print('Luminance shape: {}'.format(luminance_uint8.shape))
+        print('Luminance data-type: {}'.format(luminance_uint8.dtype))
+        print('Is the luminance computed by `rgb_to_y` equal to the luminance channel computed by `rgb_to_ycbcr`? {}'.format(numpy.array_equal(luminance_uint8, tls.rgb_to_ycbcr(rgb_uint8)[:, :, 0])))
+    
     def test_rgb_to_ycbcr(self):
         """Tests the function `rgb_to_ycbcr`.
         
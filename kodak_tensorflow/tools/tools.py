@@ -18,6 +18,89 @@ import PIL.Image
 import scipy.stats.distributions
 import six.moves.urllib
 import tarfile
+import threading
+
+# Numba and PyTurboJPEG are optional. They are loaded at
+# the first call to `rgb_to_y` and `read_rgb` respectively,
+# not when this module is imported. This way, the many scripts
+# importing this module without calling these two functions do
+# not pay for importing Numba and loading libjpeg-turbo. If
+# Numba is not installed, `rgb_to_y` falls back to Numpy. If
+# either PyTurboJPEG or libjpeg-turbo is not installed, `read_rgb`
+# falls back to PIL.
+numba = None
+turbojpeg = None
+turbo_jpeg = None
+_rgb_to_y_numba = None
+_names_optional_loaded = set()
+_lock_optional = threading.Lock()
+
+def _load_numba():
+    """Imports Numba and wraps the kernel converting RGB into luminance if it is the first call.
+    
+    Returns
+    -------
+    function
+        Kernel converting RGB into luminance.
+        None if Numba is not installed.
+    
+    """
+    global numba, _rgb_to_y_numba
+    if 'numba' not in _names_optional_loaded:
+        with _lock_optional:
+            if 'numba' not in _names_optional_loaded:
+                try:
+                    import numba
+                except ImportError:
+                    pass
+                else:
+                    
+                    # No signature is given to `numba.njit`. This way,
+                    # the kernel is compiled at its first call. `cache=True`
+                    # saves the compiled kernel to the disk so that the
+                    # compilation happens once per type of input arrays.
+                    _rgb_to_y_numba = numba.njit(parallel=True, nogil=True, cache=True)(_rgb_to_y_kernel)
+                _names_optional_loaded.add('numba')
+    return _rgb_to_y_numba
+
+def _load_turbo_jpeg():
+    """Imports PyTurboJPEG and loads libjpeg-turbo if it is the first call.
+    
+    `read_rgb` is called by several threads
+    at the same time. That is why the loading
+    is protected by a lock.
+    
+    Returns
+    -------
+    turbojpeg.TurboJPEG
+        Wrapper of the TurboJPEG API of libjpeg-turbo.
+        None if either PyTurboJPEG or libjpeg-turbo
+        is not installed.
+    
+    """
+    global turbojpeg, turbo_jpeg
+    if 'turbojpeg' not in _names_optional_loaded:
+        with _lock_optional:
+            if 'turbojpeg' not in _names_optional_loaded:
+                try:
+                    import turbojpeg
+                    turbo_jpeg = turbojpeg.TurboJPEG()
+                except (ImportError, OSError, RuntimeError):
+                    turbo_jpeg = None
+                _names_optional_loaded.add('turbojpeg')
+    return turbo_jpeg
+
+def _rgb_to_y_kernel(rgb_uint8, y_uint8):
+    (height_image, width_image) = rgb_uint8.shape[0:2]
+    
+    # `fastmath` is not enabled. This way, the floats
+    # are rounded exactly as in the Numpy implementation.
+    for i in numba.prange(height_image):
+        for j in range(width_image):
+            y_float64 = 16. + (65.481/255.)*rgb_uint8[i, j, 0]
+            y_float64 += (128.553/255.)*rgb_uint8[i, j, 1]
+            y_float64 += (24.966/255.)*rgb_uint8[i, j, 2]
+            y_uint8[i, j] = numpy.uint8(numpy.rint(y_float64))
 
 # The functions are sorted in
 # alphabetic order.
@@ -262,6 +345,45 @@ def compute_bjontegaard(rates_0, psnrs_0, rates_1, psnrs_1):
     integral_1 = numpy.polyval(antiderivative_1, maximum) - numpy.polyval(antiderivative_1, minimum)
     return 100.*(numpy.exp((integral_1 - integral_0)/(maximum - minimum)).item() - 1.)
 
+def compute_position_crop(height_image, width_image, width_crop, is_random):
+    """Computes the position of the top-left corner of a random crop if it is the random option. Computes the position of the top-left corner of the central crop otherwise.
+    
+    Parameters
+    ----------
+    height_image : int
+        Height of the image.
+    width_image : int
+        Width of the image.
+    width_crop : int
+        Width of the crop.
+    is_random : bool
+        Is it the random option?
+    
+    Returns
+    -------
+    tuple
+        int
+            Row of the top-left corner of the crop.
+        int
+            Column of the top-left corner of the crop.
+    
+    Raises
+    ------
+    ValueError
+        If either the height or the width of the
+        image is not larger than the width of the crop.
+    
+    """
+    if height_image < width_crop or width_image < width_crop:
+        raise ValueError('Either the height or the width of the image is not larger than the width of the crop.')
+    if is_random:
+        row_top_left = numpy.random.choice(height_image - width_crop + 1)
+        column_top_left = numpy.random.choice(width_image - width_crop + 1)
+    else:
+        row_top_left = (height_image - width_crop)//2
+        column_top_left = (width_image - width_crop)//2
+    return (row_top_left, column_top_left)
+
 def convert_approx_entropy(scaled_approx_entropy, gamma_scaling, nb_maps):
     """Converts the scaled cumulated approximate entropy of the quantized latent variables into its mean form.
     
@@ -423,12 +545,10 @@ def crop_option_2d(luminance_uint8, width_crop, is_random):
     (height_image, width_image) = luminance_uint8.shape
     if height_image < width_crop or width_image < width_crop:
         raise ValueError('Either the height or the width of the luminance image is not larger than the width of the crop.')
-    if is_random:
-        i = numpy.random.choice(height_image - width_crop + 1)
-        j = numpy.random.choice(width_image - width_crop + 1)
-    else:
-        i = (height_image - width_crop)//2
-        j = (width_image - width_crop)//2
+    (i, j) = compute_position_crop(height_image,
+                                   width_image,
+                                   width_crop,
+                                   is_random)
     return luminance_uint8[i:i + width_crop, j:j + width_crop]
 
 def crop_repeat_2d(image_uint8, row_top_left, column_top_left):
@@ -567,6 +687,31 @@ def download_untar_archive(source_url, path_to_folder_extraction, path_to_tar):
                   path_to_tar)
     return is_downloaded
 
+def drop_page_cache(path):
+    """Writes the file to the disk and asks the kernel to drop the file from the page cache.
+    
+    `drop_page_cache` does nothing if the
+    OS does not provide `posix_fadvise`.
+    
+    Parameters
+    ----------
+    path : str
+        Path to the file to be dropped
+        from the page cache.
+    
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    file_descriptor = os.open(path, os.O_RDONLY)
+    try:
+        
+        # Dirty pages cannot be dropped. That is
+        # why the file is written to the disk first.
+        os.fsync(file_descriptor)
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(file_descriptor)
+
 def float_to_str(float_in):
     """Converts the float into a string.
     
@@ -828,6 +973,30 @@ def plot_graphs(x_values, y_values, x_label, y_label, legend, colors, title, pat
     plt.savefig(path)
     plt.clf()
 
+def prefetch_file(path):
+    """Asks the kernel to read the file into the page cache in the background.
+    
+    `prefetch_file` returns without waiting for the
+    file to be read. It does nothing if the OS does not
+    provide `posix_fadvise` or if the file cannot be opened.
+    
+    Parameters
+    ----------
+    path : str
+        Path to the file to be prefetched.
+    
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        file_descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(file_descriptor)
+
 def psnr_2d(reference_uint8, reconstruction_uint8):
     """Computes the PSNR between the luminance image and its reconstruction.
     
@@ -1016,6 +1185,134 @@ def read_image_mode(path, mode):
         raise ValueError('The image mode is {0} whereas the given mode is {1}.'.format(image.mode, mode))
     return numpy.asarray(image)
 
+def read_rgb(path):
+    """Reads the image if its mode is RGB.
+    
+    If PyTurboJPEG is installed, a JPEG image
+    is decoded via the TurboJPEG API of libjpeg-turbo.
+    Otherwise, `read_rgb` is equivalent to `read_image_mode`
+    with the mode 'RGB'.
+    
+    Parameters
+    ----------
+    path : str
+        Path to the image to be read.
+    
+    Returns
+    -------
+    numpy.ndarray
+        3D array with data-type `numpy.uint8`.
+        RGB image.
+    
+    Raises
+    ------
+    ValueError
+        If the image mode is not equal to 'RGB'.
+    
+    """
+    if _load_turbo_jpeg() is None:
+        return read_image_mode(path, 'RGB')
+    with open(path, 'rb') as file:
+        data = file.read()
+    
+    # A JPEG image starts with the SOI marker.
+    if not data.startswith(b'\xff\xd8'):
+        return read_image_mode(path, 'RGB')
+    
+    # PIL opens a JPEG image whose color space is either
+    # RGB or YCbCr in mode 'RGB'. It opens a grayscale JPEG
+    # image in mode 'L' and a CMYK or YCCK JPEG image in
+    # mode 'CMYK'.
+    jpeg_colorspace = turbo_jpeg.decode_header(data)[3]
+    if jpeg_colorspace == turbojpeg.TJCS_GRAY:
+        raise ValueError('The image mode is L whereas the given mode is RGB.')
+    if jpeg_colorspace not in (turbojpeg.TJCS_RGB, turbojpeg.TJCS_YCbCr):
+        raise ValueError('The image mode is CMYK whereas the given mode is RGB.')
+    
+    # By default, the TurboJPEG API uses the accurate
+    # integer DCT and the fancy upsampling, like PIL.
+    return turbo_jpeg.decode(data,
+                             pixel_format=turbojpeg.TJPF_RGB)
+
+def rgb_to_y(rgb_uint8, out=None):
+    """Converts the RGB image to luminance.
+    
+    `rgb_to_y` computes only the luminance channel
+    of the function `rgb_to_ycbcr`. The arithmetic
+    is the same so that, for a given RGB image, the
+    luminance image computed by `rgb_to_y` is identical
+    to the luminance channel computed by `rgb_to_ycbcr`.
+    
+    Parameters
+    ----------
+    rgb_uint8 : numpy.ndarray
+        3D array with data-type `numpy.uint8`.
+        RGB image.
+    out : numpy.ndarray, optional
+        2D array with data-type `numpy.uint8`.
+        Array in which the luminance image is
+        written. Its shape is equal to `rgb_uint8.shape[0:2]`.
+        The default value is None. If it is None,
+        a new array is allocated.
+    
+    Returns
+    -------
+    numpy.ndarray
+        2D array with data-type `numpy.uint8`.
+        Luminance image. If `out` is not None,
+        `out` is returned.
+    
+    Raises
+    ------
+    TypeError
+        If `rgb_uint8.dtype` is not equal to `numpy.uint8`.
+    ValueError
+        If `rgb_uint8.ndim` is not equal to 3.
+    ValueError
+        If `rgb_uint8.shape[2]` is not equal to 3.
+    TypeError
+        If `out.dtype` is not equal to `numpy.uint8`.
+    ValueError
+        If `out.shape` is not equal to `rgb_uint8.shape[0:2]`.
+    
+    """
+    if rgb_uint8.dtype != numpy.uint8:
+        raise TypeError('`rgb_uint8.dtype` is not equal to `numpy.uint8`.')
+    if rgb_uint8.ndim != 3:
+        raise ValueError('`rgb_uint8.ndim` is not equal to 3.')
+    if rgb_uint8.shape[2] != 3:
+        raise ValueError('`rgb_uint8.shape[2]` is not equal to 3.')
+    if out is None:
+        out = numpy.empty(rgb_uint8.shape[0:2], dtype=numpy.uint8)
+    else:
+        if out.dtype != numpy.uint8:
+            raise TypeError('`out.dtype` is not equal to `numpy.uint8`.')
+        if out.shape != rgb_uint8.shape[0:2]:
+            raise ValueError('`out.shape` is not equal to `rgb_uint8.shape[0:2]`.')
+    
+    # The Numba kernel runs the conversion in a
+    # single pass over the RGB image, in parallel
+    # over the rows of the RGB image.
+    if _load_numba() is not None:
+        _rgb_to_y_numba(rgb_uint8, out)
+        return out
+    
+    # The additions are carried out in place and in the
+    # same order as in `rgb_to_ycbcr`. This way, the
+    # rounding of the floats is the same in the two functions.
+    y_float64 = (65.481/255.)*rgb_uint8[:, :, 0]
+    y_float64 += 16.
+    y_float64 += (128.553/255.)*rgb_uint8[:, :, 1]
+    y_float64 += (24.966/255.)*rgb_uint8[:, :, 2]
+    
+    # The luminance belongs to [16., 235.] so
+    # there is no need to clip it before casting
+    # from `numpy.float64` to `numpy.uint8`.
+    numpy.copyto(out,
+                 numpy.rint(y_float64, out=y_float64),
+                 casting='unsafe')
+    return out
+
 def rgb_to_ycbcr(rgb_uint8):
     """Converts the RGB image to YCbCr.
     